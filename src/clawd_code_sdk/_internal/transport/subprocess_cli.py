@@ -37,6 +37,17 @@ logger = logging.getLogger(__name__)
 
 _DEFAULT_MAX_BUFFER_SIZE = 10 * 1024 * 1024  # 1MB buffer limit
 
+# Flags passed on every invocation, independent of the options
+_STREAM_FLAGS = (
+    "--output-format",
+    "stream-json",
+    "--verbose",
+    "--input-format",
+    "stream-json",
+    "--include-partial-messages",
+    "--enable-auto-mode",
+)
+
 
 class SubprocessCLITransport(Transport):
     """Subprocess transport using Claude Code CLI."""
@@ -59,18 +70,7 @@ class SubprocessCLITransport(Transport):
         """Build CLI command with arguments."""
         if self._cli_path is None:
             raise CLINotFoundError("CLI path not resolved. Call connect() first.")
-        cmd = [
-            self._cli_path,
-            "--output-format",
-            "stream-json",
-            "--verbose",
-            "--input-format",
-            "stream-json",
-            "--include-partial-messages",
-            "--enable-auto-mode",
-        ]
-        cmd.extend(to_cli_args(self._options))
-        return cmd
+        return [self._cli_path, *_STREAM_FLAGS, *to_cli_args(self._options)]
 
     async def connect(self) -> None:
         """Start subprocess."""
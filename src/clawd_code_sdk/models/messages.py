@@ -11,7 +11,9 @@ from anthropic.types.beta import (
     BetaMessageDeltaUsage,
     BetaRawContentBlockDeltaEvent,
     BetaRawContentBlockStartEvent,
+    BetaRawContentBlockStopEvent,
     BetaRawMessageDeltaEvent,
+    BetaRawMessageStopEvent,
     BetaRawMessageStreamEvent,
     BetaStopReason,  # noqa: TC002
     BetaTextBlock as ATextBlock,
@@ -319,60 +321,71 @@ class StreamEvent(BaseMessage):
     parent_tool_use_id: str | None = None
     ttft_ms: float | None = None
 
+    @classmethod
+    def synthetic(
+        cls, event: BetaRawMessageStreamEvent, *, session_id: str, uuid: str
+    ) -> StreamEvent:
+        """Wrap a locally built event without re-validating it.
+
+        Used by the synthetic factories below (e.g. for session replay), whose
+        events are constructed from already-validated values.
+        """
+        return cls.model_construct(event=event, session_id=session_id, uuid=uuid)
+
     @classmethod
     def block_stop(cls, *, index: int, session_id: str, uuid: str) -> StreamEvent:
         """Create a synthetic content_block_stop StreamEvent."""
-        from anthropic.types.beta import BetaRawContentBlockStopEvent
-
-        stop_event = BetaRawContentBlockStopEvent(type="content_block_stop", index=index)
-        return StreamEvent(event=stop_event, session_id=session_id, uuid=uuid)
+        stop_event = BetaRawContentBlockStopEvent.model_construct(
+            type="content_block_stop", index=index
+        )
+        return cls.synthetic(stop_event, session_id=session_id, uuid=uuid)
 
     @classmethod
     def message_stop(cls, *, session_id: str, uuid: str) -> StreamEvent:
         """Create a synthetic message_stop StreamEvent."""
-        from anthropic.types.beta import BetaRawMessageStopEvent
-
-        stop_event = BetaRawMessageStopEvent(type="message_stop")
-        return StreamEvent(event=stop_event, session_id=session_id, uuid=uuid)
+        stop_event = BetaRawMessageStopEvent.model_construct(type="message_stop")
+        return cls.synthetic(stop_event, session_id=session_id, uuid=uuid)
 
     @classmethod
     def block_start_text(cls, *, index: int, session_id: str, uuid: str) -> StreamEvent:
         """Create a synthetic content_block_start StreamEvent for a text block."""
-        content_block = ATextBlock(type="text", text="")
-        start_event = BetaRawContentBlockStartEvent(
+        content_block = ATextBlock.model_construct(type="text", text="")
+        start_event = BetaRawContentBlockStartEvent.model_construct(
             type="content_block_start", index=index, content_block=content_block
         )
-        return StreamEvent(event=start_event, session_id=session_id, uuid=uuid)
+        return cls.synthetic(start_event, session_id=session_id, uuid=uuid)
 
     @classmethod
     def block_start_thinking(cls, *, index: int, session_id: str, uuid: str) -> StreamEvent:
         """Create a synthetic content_block_start StreamEvent for a thinking block."""
-        content_block = AThinkingBlock(type="thinking", thinking="", signature="")
-        start_event = BetaRawContentBlockStartEvent(
+        content_block = AThinkingBlock.model_construct(type="thinking", thinking="", signature="")
+        start_event = BetaRawContentBlockStartEvent.model_construct(
             type="content_block_start", index=index, content_block=content_block
         )
-        return StreamEvent(event=start_event, session_id=session_id, uuid=uuid)
+        return cls.synthetic(start_event, session_id=session_id, uuid=uuid)
 
     @classmethod
     def block_start_tool_use(
         cls, *, tool_use_id: str, name: str, index: int, session_id: str, uuid: str
     ) -> StreamEvent:
         """Create a synthetic content_block_start StreamEvent for a tool_use block."""
-        content_block = AToolUseBlock(type="tool_use", id=tool_use_id, name=name, input={})
-        start_event = BetaRawContentBlockStartEvent(
+        content_block = AToolUseBlock.model_construct(
+            type="tool_use", id=tool_use_id, name=name, input={}
+        )
+        start_event = BetaRawContentBlockStartEvent.model_construct(
             type="content_block_start", index=index, content_block=content_block
         )
-        return StreamEvent(event=start_event, session_id=session_id, uuid=uuid)
+        return cls.synthetic(start_event, session_id=session_id, uuid=uuid)
 
     @classmethod
     def block_text_delta(cls, *, text: str, index: int, session_id: str, uuid: str) -> StreamEvent:
         """Create a synthetic content_block_delta StreamEvent with full block content."""
-        delta_event = BetaRawContentBlockDeltaEvent(
+        delta_event = BetaRawContentBlockDeltaEvent.model_construct(
             type="content_block_delta",
             index=index,
-            delta=BetaTextDelta(type="text_delta", text=text),
+            delta=BetaTextDelta.model_construct(type="text_delta", text=text),
         )
-        return StreamEvent(event=delta_event, session_id=session_id, uuid=uuid)
+        return cls.synthetic(delta_event, session_id=session_id, uuid=uuid)
 
     @classmethod
     def block_thinking_delta(
@@ -384,12 +397,12 @@ class StreamEvent(BaseMessage):
         uuid: str,
     ) -> StreamEvent:
         """Create a synthetic content_block_delta StreamEvent with full block content."""
-        delta_event = BetaRawContentBlockDeltaEvent(
+        delta_event = BetaRawContentBlockDeltaEvent.model_construct(
             type="content_block_delta",
             index=index,
-            delta=BetaThinkingDelta(type="thinking_delta", thinking=thinking),
+            delta=BetaThinkingDelta.model_construct(type="thinking_delta", thinking=thinking),
         )
-        return StreamEvent(event=delta_event, session_id=session_id, uuid=uuid)
+        return cls.synthetic(delta_event, session_id=session_id, uuid=uuid)
 
     @classmethod
     def block_tool_json_delta(
@@ -401,12 +414,14 @@ class StreamEvent(BaseMessage):
         uuid: str,
     ) -> StreamEvent:
         """Create a synthetic content_block_delta StreamEvent with full block content."""
-        delta_event = BetaRawContentBlockDeltaEvent(
+        delta_event = BetaRawContentBlockDeltaEvent.model_construct(
             type="content_block_delta",
             index=index,
-            delta=BetaInputJSONDelta(type="input_json_delta", partial_json=partial_json),
+            delta=BetaInputJSONDelta.model_construct(
+                type="input_json_delta", partial_json=partial_json
+            ),
         )
-        return StreamEvent(event=delta_event, session_id=session_id, uuid=uuid)
+        return cls.synthetic(delta_event, session_id=session_id, uuid=uuid)
 
     @classmethod
     def message_delta(
@@ -417,10 +432,13 @@ class StreamEvent(BaseMessage):
         uuid: str,
     ) -> StreamEvent:
         """Create a synthetic message_delta StreamEvent."""
-        usage = BetaMessageDeltaUsage(output_tokens=0)
-        delta = BetaRawMessageDelta(stop_reason=stop_reason)
-        delta_event = BetaRawMessageDeltaEvent(type="message_delta", delta=delta, usage=usage)
-        return StreamEvent(event=delta_event, session_id=session_id, uuid=uuid)
+        delta = BetaRawMessageDelta.model_construct(stop_reason=stop_reason)
+        delta_event = BetaRawMessageDeltaEvent.model_construct(
+            type="message_delta",
+            delta=delta,
+            usage=BetaMessageDeltaUsage.model_construct(output_tokens=0),
+        )
+        return cls.synthetic(delta_event, session_id=session_id, uuid=uuid)
 
 
 class ToolProgressMessage(BaseMessage):
@@ -14,6 +14,8 @@ from pydantic import TypeAdapter, ValidationError
 
 
 if TYPE_CHECKING:
+    from collections.abc import Container, Iterator
+
     from clawd_code_sdk.storage.models import ClaudeJSONLEntry
 
 
@@ -53,13 +55,22 @@ def count_session_messages(session_path: Path) -> int:
     return count
 
 
-def read_session(session_path: Path) -> list[ClaudeJSONLEntry]:
-    """Read all entries from a session file."""
+def iter_session(
+    session_path: Path,
+    *,
+    entry_types: Container[str] | None = None,
+) -> Iterator[ClaudeJSONLEntry]:
+    """Lazily yield entries from a session file, one line at a time.
+
+    Args:
+        session_path: Path to the JSONL session file
+        entry_types: If given, only entries whose ``type`` is in this collection
+            are validated and yielded; other lines are skipped after JSON parsing.
+    """
     from clawd_code_sdk.storage.models import ClaudeJSONLEntry
 
-    entries: list[ClaudeJSONLEntry] = []
     if not session_path.exists():
-        return entries
+        return
 
     adapter = TypeAdapter[ClaudeJSONLEntry](ClaudeJSONLEntry)
     with session_path.open("r", encoding="utf-8") as f:
@@ -69,15 +80,22 @@ def read_session(session_path: Path) -> list[ClaudeJSONLEntry]:
                 continue
             try:
                 data = anyenv.load_json(stripped, return_type=dict)
+                if entry_types is not None and data.get("type") not in entry_types:
+                    continue
                 entry = adapter.validate_python(data)
-                entries.append(entry)
             except anyenv.JsonLoadError as e:
                 msg = "Failed to parse JSONL line (path: %s, error: %s, raw_line: %s)"
                 logger.warning(msg, str(session_path), str(e), raw_line)
             except ValidationError as e:
                 msg = "Failed to validate JSONL entry (path: %s, error: %s)"
                 logger.warning(msg, str(session_path), str(e))
-    return entries
+            else:
+                yield entry
+
+
+def read_session(session_path: Path) -> list[ClaudeJSONLEntry]:
+    """Read all entries from a session file (see :func:`iter_session`)."""
+    return list(iter_session(session_path))
 
 
 def get_claude_data_dir() -> Path:
@@ -59,7 +59,9 @@ class ClaudeUsage(Usage):
         and sums across all unique API calls.
         """
         seen_ids: set[str] = set()
-        total = cls()
+        # Sum into plain ints and build the model once, instead of going through
+        # pydantic attribute assignment for every counter of every unique message.
+        input_tokens = output_tokens = cache_creation = cache_read = 0
         for entry in entries:
             if not isinstance(entry, ClaudeAssistantEntry):
                 continue
@@ -67,8 +69,17 @@ class ClaudeUsage(Usage):
             if msg.id in seen_ids:
                 continue
             seen_ids.add(msg.id)
-            total.accumulate(msg.usage)
-        return total
+            usage = msg.usage
+            input_tokens += usage.input_tokens
+            output_tokens += usage.output_tokens
+            cache_creation += usage.cache_creation_input_tokens
+            cache_read += usage.cache_read_input_tokens
+        return cls(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_creation_input_tokens=cache_creation,
+            cache_read_input_tokens=cache_read,
+        )
 
 
 # =============================================================================
@@ -163,9 +174,10 @@ class ClaudeUserEntry(ClaudeMessageEntryBase):
     @property
     def is_tool_result(self) -> bool:
         """Whether this is a synthetic tool_result entry (vs. an actual user prompt)."""
-        if isinstance(self.message.content, str):
+        content = self.message.content
+        if isinstance(content, str) or not content:
             return False
-        return all(b.type == "tool_result" for b in self.message.content)
+        return all(b.type == "tool_result" for b in content)
 
 
 class ClaudeAssistantEntry(ClaudeMessageEntryBase):
@@ -52,14 +52,13 @@ Example::
 from __future__ import annotations
 
 import json as _json
-from typing import TYPE_CHECKING, assert_never
+from typing import TYPE_CHECKING
 
 from anthropic.types.beta import BetaMessage, BetaRawMessageStartEvent, BetaUsage
 
 from clawd_code_sdk.models import (
     AssistantMessage,
     AssistantMessageContent,
-    ImageBlock,
     MessageParam,
     ResultErrorMessage,
     ResultSuccessMessage,
@@ -67,12 +66,11 @@ from clawd_code_sdk.models import (
     TextBlock,
     ThinkingBlock,
     ToolProgressMessage,
-    ToolResultBlock,
     ToolUseBlock,
     Usage,
     UserMessage,
 )
-from clawd_code_sdk.storage.helpers import read_session
+from clawd_code_sdk.storage.helpers import iter_session
 from clawd_code_sdk.storage.models import (
     ClaudeApiMessage,
     ClaudeAssistantEntry,
@@ -85,10 +83,10 @@ from clawd_code_sdk.storage.models import (
 
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator, Sequence
+    from collections.abc import Callable, Iterable, Iterator, Sequence
     from pathlib import Path
 
-    from clawd_code_sdk.models import AssistantContentBlock, ContentBlock, Message, StopReason
+    from clawd_code_sdk.models import AssistantContentBlock, Message, StopReason
     from clawd_code_sdk.storage.models import ClaudeJSONLEntry
 
 
@@ -109,15 +107,17 @@ def _convert_user_entry(entry: ClaudeUserEntry) -> UserMessage:
 
 
 def _convert_assistant_entry(entry: ClaudeAssistantEntry) -> AssistantMessage:
-    """Convert a stored assistant entry to a wire-format AssistantMessage."""
-    raw = entry.message.content
-    blocks: Sequence[AssistantContentBlock] = (
-        [TextBlock(text=raw)] if isinstance(raw, str) else list(raw)
-    )
-    model = entry.message.model
-    msg_id = entry.message.id
-    return AssistantMessage(
-        message=AssistantMessageContent(content=blocks, model=model, id=msg_id),
+    """Convert a stored assistant entry to a wire-format AssistantMessage.
+
+    The stored blocks are already validated wire-format blocks, so they are
+    passed through as-is (the same objects the synthetic deltas refer to)
+    instead of being copied and re-validated.
+    """
+    msg = entry.message
+    raw = msg.content
+    blocks: Sequence[AssistantContentBlock] = [TextBlock(text=raw)] if isinstance(raw, str) else raw
+    return AssistantMessage.model_construct(
+        message=AssistantMessageContent.model_construct(content=blocks, model=msg.model, id=msg.id),
         uuid=entry.uuid,
         session_id=entry.session_id,
         error="unknown" if entry.is_api_error_message else None,
@@ -155,75 +155,58 @@ def _convert_summary_entry(entry: ClaudeSummaryEntry) -> UserMessage:
 
 def _make_message_start(*, msg_id: str, model: str, session_id: str, uuid: str) -> StreamEvent:
     """Create a synthetic message_start StreamEvent."""
-    message = BetaMessage(
+    message = BetaMessage.model_construct(
         id=msg_id,
         type="message",
         role="assistant",
         content=[],
         model=model,
-        usage=BetaUsage(input_tokens=0, output_tokens=0),
+        usage=BetaUsage.model_construct(input_tokens=0, output_tokens=0),
     )
-    start_event = BetaRawMessageStartEvent(type="message_start", message=message)
-    return StreamEvent(event=start_event, session_id=session_id, uuid=uuid)
+    start_event = BetaRawMessageStartEvent.model_construct(type="message_start", message=message)
+    return StreamEvent.synthetic(start_event, session_id=session_id, uuid=uuid)
+
+
+# Synthetic event factories keyed by exact block type, so each stored block costs
+# one dict lookup instead of a chain of class-pattern checks.
+_BLOCK_START_MAKERS: dict[type[AssistantContentBlock], Callable[..., StreamEvent]] = {
+    TextBlock: lambda _block, **kw: StreamEvent.block_start_text(**kw),
+    ThinkingBlock: lambda _block, **kw: StreamEvent.block_start_thinking(**kw),
+    ToolUseBlock: lambda block, **kw: StreamEvent.block_start_tool_use(
+        tool_use_id=block.id, name=block.name, **kw
+    ),
+}
+_BLOCK_DELTA_MAKERS: dict[type[AssistantContentBlock], Callable[..., StreamEvent]] = {
+    TextBlock: lambda block, **kw: StreamEvent.block_text_delta(text=block.text, **kw),
+    ThinkingBlock: lambda block, **kw: StreamEvent.block_thinking_delta(
+        thinking=block.thinking, **kw
+    ),
+    ToolUseBlock: lambda block, **kw: StreamEvent.block_tool_json_delta(
+        partial_json=_json.dumps(block.input), **kw
+    ),
+}
 
 
 def _make_block_start(
-    block: ContentBlock,
+    block: AssistantContentBlock,
     *,
     index: int,
     session_id: str,
     uuid: str,
-) -> Iterator[StreamEvent]:
+) -> StreamEvent:
     """Create a synthetic content_block_start StreamEvent for a stored block."""
-    match block:
-        case TextBlock():
-            yield StreamEvent.block_start_text(index=index, session_id=session_id, uuid=uuid)
-        case ThinkingBlock():
-            yield StreamEvent.block_start_thinking(index=index, session_id=session_id, uuid=uuid)
-        case ToolUseBlock(id=block_id, name=name):
-            yield StreamEvent.block_start_tool_use(
-                tool_use_id=block_id, name=name, index=index, session_id=session_id, uuid=uuid
-            )
-        case ToolResultBlock() | ImageBlock():
-            return
-        case _ as unreachable:
-            assert_never(unreachable)
+    return _BLOCK_START_MAKERS[type(block)](block, index=index, session_id=session_id, uuid=uuid)
 
 
 def _make_block_delta(
-    block: ContentBlock,
+    block: AssistantContentBlock,
     *,
     index: int,
     session_id: str,
     uuid: str,
-) -> Iterator[StreamEvent]:
+) -> StreamEvent:
     """Create a synthetic content_block_delta StreamEvent with full block content."""
-    match block:
-        case TextBlock(text=text):
-            yield StreamEvent.block_text_delta(
-                text=text,
-                index=index,
-                session_id=session_id,
-                uuid=uuid,
-            )
-        case ThinkingBlock(thinking=thinking):
-            yield StreamEvent.block_thinking_delta(
-                thinking=thinking,
-                index=index,
-                session_id=session_id,
-                uuid=uuid,
-            )
-        case ToolUseBlock(input=input_):
-            yield StreamEvent.block_tool_json_delta(
-                partial_json=_json.dumps(input_),
-                index=index,
-                session_id=session_id,
-                uuid=uuid,
-            )
-        case ToolResultBlock() | ImageBlock():
-            return
-        case _ as unreachable:
-            assert_never(unreachable)
+    return _BLOCK_DELTA_MAKERS[type(block)](block, index=index, session_id=session_id, uuid=uuid)
 
 
 def _make_synthetic_result(
@@ -242,7 +225,6 @@ def _make_synthetic_result(
     ``duration_ms``, ``duration_api_ms``, ``total_cost_usd``, ``model_usage``.
     """
     seen_msg_ids: set[str] = set()
-    total_usage = ClaudeUsage()
     last_uuid = ""
     session_id = ""
     is_error = False
@@ -251,19 +233,18 @@ def _make_synthetic_result(
     for entry in turn_entries:
         match entry:
             case ClaudeAssistantEntry(
-                message=ClaudeApiMessage(id=msg_id, stop_reason=reason, usage=usage),
+                message=ClaudeApiMessage(id=msg_id, stop_reason=reason),
                 uuid=last_uuid,
                 session_id=session_id,
                 is_api_error_message=is_api_error_message,
             ):
                 if is_api_error_message:
                     is_error = True
-                if msg_id not in seen_msg_ids:
-                    seen_msg_ids.add(msg_id)
-                    total_usage.accumulate(usage)
+                seen_msg_ids.add(msg_id)
                 if reason is not None:
                     stop_reason = reason
 
+    total_usage = ClaudeUsage.from_entries(turn_entries)
     token_usage = Usage(
         input_tokens=total_usage.input_tokens,
         output_tokens=total_usage.output_tokens,
@@ -311,44 +292,75 @@ def _replay_basic(
     """Replay entries without stream events (basic mode)."""
     turn_entries: list[ClaudeJSONLEntry] = []
 
+    # Plain isinstance chain rather than ``match``: this runs once per stored entry,
+    # and class patterns with captures/guards add dispatch overhead per arm.
     for entry in entries:
-        match entry:
-            case ClaudeUserEntry() if not entry.is_tool_result:
+        if isinstance(entry, ClaudeUserEntry):
+            if entry.is_tool_result:
+                # Tool-result user entry — part of current turn
+                turn_entries.append(entry)
+            else:
                 # Non-tool-result user entry = new turn boundary
                 if include_result and turn_entries:
                     yield _make_synthetic_result(turn_entries)
                 turn_entries = []
-                yield _convert_user_entry(entry)
-            case ClaudeUserEntry():
-                # Tool-result user entry — part of current turn
-                turn_entries.append(entry)
-                yield _convert_user_entry(entry)
-            case ClaudeAssistantEntry():
-                turn_entries.append(entry)
-                yield _convert_assistant_entry(entry)
-            case ClaudeProgressEntry(data=ClaudeToolProgressData() as data) if include_progress:
-                yield _convert_progress_entry(entry, data)
-            case ClaudeSummaryEntry() if include_summaries:
-                yield _convert_summary_entry(entry)
+            yield _convert_user_entry(entry)
+        elif isinstance(entry, ClaudeAssistantEntry):
+            turn_entries.append(entry)
+            yield _convert_assistant_entry(entry)
+        elif (
+            include_progress
+            and isinstance(entry, ClaudeProgressEntry)
+            and isinstance(entry.data, ClaudeToolProgressData)
+        ):
+            yield _convert_progress_entry(entry, entry.data)
+        elif include_summaries and isinstance(entry, ClaudeSummaryEntry):
+            yield _convert_summary_entry(entry)
 
     # Emit result for the final turn
     if include_result and turn_entries:
         yield _make_synthetic_result(turn_entries)
 
 
-def _get_assistant_msg_id(entry: ClaudeAssistantEntry) -> str | None:
-    """Extract the API message ID from an assistant entry."""
-    return entry.message.id if isinstance(entry.message, ClaudeApiMessage) else None
+class _Lookahead:
+    """Single-pass iterator over entries with one entry of lookahead."""
+
+    __slots__ = ("_buffered", "_it")
 
+    def __init__(self, entries: Iterable[ClaudeJSONLEntry]) -> None:
+        self._it = iter(entries)
+        self._buffered: list[ClaudeJSONLEntry] = []
 
-def _get_assistant_model(entry: ClaudeAssistantEntry) -> str:
-    """Extract the model name from an assistant entry."""
-    return entry.message.model if isinstance(entry.message, ClaudeApiMessage) else "unknown"
+    def __iter__(self) -> Iterator[ClaudeJSONLEntry]:
+        return self
 
+    def __next__(self) -> ClaudeJSONLEntry:
+        if self._buffered:
+            return self._buffered.pop()
+        return next(self._it)
 
-def _get_assistant_stop_reason(entry: ClaudeAssistantEntry) -> StopReason | None:
-    """Extract the stop reason from an assistant entry."""
-    return entry.message.stop_reason if isinstance(entry.message, ClaudeApiMessage) else None
+    def peek(self) -> ClaudeJSONLEntry | None:
+        """Return the next entry without consuming it, or None when exhausted."""
+        if not self._buffered:
+            nxt = next(self._it, None)
+            if nxt is None:
+                return None
+            self._buffered.append(nxt)
+        return self._buffered[0]
+
+
+def _get_assistant_meta(
+    entry: ClaudeAssistantEntry,
+) -> tuple[str, str, StopReason | None, AssistantContentBlock | None]:
+    """Extract ``(msg_id, model, stop_reason, first_block)`` from an assistant entry.
+
+    Computed once per entry so the stream-event replay loop does not have to
+    re-inspect ``entry.message`` for every field it needs.
+    """
+    msg = entry.message
+    content = msg.content
+    first_block = content[0] if isinstance(content, list) and content else None
+    return msg.id, msg.model, msg.stop_reason, first_block
 
 
 def _replay_with_stream_events(
@@ -382,30 +394,15 @@ def _replay_with_stream_events(
         message_stop
         ResultMessage (synthetic, if include_result)
     """
-    entry_list = list(entries)
-    i = 0
+    lookahead = _Lookahead(entries)
     turn_entries: list[ClaudeJSONLEntry] = []
 
-    while i < len(entry_list):
-        match entry_list[i]:
-            case ClaudeAssistantEntry(uuid=uuid, session_id=session_id) as entry:
-                # Start of an API response group — collect all entries with same msg_id
-                msg_id = _get_assistant_msg_id(entry) or uuid
-                model = _get_assistant_model(entry)
-                # Find extent of this group (consecutive assistant entries with same msg_id)
-                group_start = i
-                while i < len(entry_list):
-                    e = entry_list[i]
-                    if isinstance(e, ClaudeAssistantEntry) and _get_assistant_msg_id(e) == msg_id:
-                        i += 1
-                    else:
-                        break
-                group = entry_list[group_start:i]
-                turn_entries.extend(group)
-                # Get stop_reason from the last entry in the group
-                last_assistant = group[-1]
-                assert isinstance(last_assistant, ClaudeAssistantEntry)
-                stop_reason = _get_assistant_stop_reason(last_assistant)
+    for entry in lookahead:
+        match entry:
+            case ClaudeAssistantEntry(uuid=uuid, session_id=session_id):
+                # Start of an API response group (consecutive entries with the same msg_id)
+                msg_id, model, stop_reason, stored_block = _get_assistant_meta(entry)
+                msg_id = msg_id or uuid
                 # → message_start
                 yield _make_message_start(
                     msg_id=msg_id,
@@ -414,23 +411,19 @@ def _replay_with_stream_events(
                     uuid=uuid,
                 )
 
-                # → per-block events
-                for block_index, assistant_entry in enumerate(group):
-                    assert isinstance(assistant_entry, ClaudeAssistantEntry)
-                    stored_block = (
-                        c[0]
-                        if isinstance((c := assistant_entry.message.content), list) and c
-                        else None
-                    )
-
+                # → per-block events, emitted while the group is consumed
+                assistant_entry = entry
+                block_index = 0
+                while True:
+                    turn_entries.append(assistant_entry)
                     if stored_block is not None:
-                        yield from _make_block_start(
+                        yield _make_block_start(
                             stored_block,
                             index=block_index,
                             session_id=assistant_entry.session_id,
                             uuid=assistant_entry.uuid,
                         )
-                        yield from _make_block_delta(
+                        yield _make_block_delta(
                             stored_block,
                             index=block_index,
                             session_id=assistant_entry.session_id,
@@ -445,80 +438,89 @@ def _replay_with_stream_events(
                             session_id=assistant_entry.session_id,
                             uuid=assistant_entry.uuid,
                         )
+                    # Only the id is read while probing, so an entry that starts the
+                    # next group has its metadata extracted once, when it is consumed.
+                    nxt = lookahead.peek()
+                    if not isinstance(nxt, ClaudeAssistantEntry) or nxt.message.id != msg_id:
+                        break
+                    next(lookahead)
+                    assistant_entry = nxt
+                    # stop_reason comes from the last entry in the group
+                    _, _, stop_reason, stored_block = _get_assistant_meta(assistant_entry)
+                    block_index += 1
+
                 # → message_delta
                 yield StreamEvent.message_delta(
                     stop_reason=stop_reason,
-                    session_id=last_assistant.session_id,
-                    uuid=last_assistant.uuid,
+                    session_id=assistant_entry.session_id,
+                    uuid=assistant_entry.uuid,
                 )
 
                 # Collect tool_result user entries that follow this group
-                while i < len(entry_list):
-                    match entry_list[i]:
-                        case ClaudeUserEntry() as e if e.is_tool_result:
-                            yield _convert_user_entry(e)
-                            i += 1
-                        case ClaudeProgressEntry(data=ClaudeToolProgressData() as data) as e if (
-                            include_progress
-                        ):
-                            yield _convert_progress_entry(e, data)
-                            i += 1
-                        case ClaudeProgressEntry():
-                            i += 1
-                        case _:
-                            break
+                while True:
+                    nxt = lookahead.peek()
+                    if isinstance(nxt, ClaudeUserEntry) and nxt.is_tool_result:
+                        yield _convert_user_entry(nxt)
+                    elif isinstance(nxt, ClaudeProgressEntry):
+                        if include_progress and isinstance(nxt.data, ClaudeToolProgressData):
+                            yield _convert_progress_entry(nxt, nxt.data)
+                    else:
+                        break
+                    next(lookahead)
 
                 # → message_stop
                 yield StreamEvent.message_stop(
-                    session_id=last_assistant.session_id, uuid=last_assistant.uuid
+                    session_id=assistant_entry.session_id, uuid=assistant_entry.uuid
                 )
 
-            case ClaudeUserEntry() as entry:
+            case ClaudeUserEntry():
                 # Non-tool-result user entry = new turn boundary
                 # (tool_result entries are consumed inside the assistant group above)
                 if include_result and turn_entries:
                     yield _make_synthetic_result(turn_entries)
                 turn_entries = []
                 yield _convert_user_entry(entry)
-                i += 1
 
-            case ClaudeProgressEntry(data=ClaudeToolProgressData() as data) as entry if (
-                include_progress
-            ):
+            case ClaudeProgressEntry(data=ClaudeToolProgressData() as data) if include_progress:
                 yield _convert_progress_entry(entry, data)
-                i += 1
 
-            case ClaudeSummaryEntry() as entry if include_summaries:
+            case ClaudeSummaryEntry() if include_summaries:
                 yield _convert_summary_entry(entry)
-                i += 1
 
             case _:
-                i += 1  # Skip non-message entries (queue ops, etc.)
+                pass  # Skip non-message entries (queue ops, etc.)
 
     # Emit result for the final turn
     if include_result and turn_entries:
         yield _make_synthetic_result(turn_entries)
 
 
+_THREAD_ENTRY_TYPES = (ClaudeUserEntry, ClaudeAssistantEntry, ClaudeProgressEntry)
+"""Entry types that carry a uuid/parent_uuid and can form a conversation thread."""
+
+
 def _resolve_thread(
-    entries: list[ClaudeJSONLEntry],
+    entries: Iterable[ClaudeJSONLEntry],
     leaf_uuid: str | None = None,
 ) -> list[ClaudeJSONLEntry]:
     """Resolve a conversation thread by walking the parent_uuid chain.
 
-    Given a list of entries and an optional leaf UUID, returns only the entries
-    that form a single conversation thread from root to leaf. Entries without
-    a uuid (summaries, queue ops, file history) are excluded.
+    Given entries in file order and an optional leaf UUID, returns only the
+    entries that form a single conversation thread from root to leaf. Entries
+    without a uuid (summaries, queue ops, file history) are excluded.
 
-    If ``leaf_uuid`` is None, the last entry with a uuid in the list is used.
+    If ``leaf_uuid`` is None, the last entry with a uuid is used. Otherwise
+    entries are only consumed up to the leaf, since parents are always written
+    before their children.
     """
-    by_uuid: dict[str, ClaudeJSONLEntry] = {}
+    by_uuid: dict[str, ClaudeUserEntry | ClaudeAssistantEntry | ClaudeProgressEntry] = {}
     last_uuid: str | None = None
     for jsonl_entry in entries:
-        match jsonl_entry:
-            case ClaudeUserEntry() | ClaudeAssistantEntry() | ClaudeProgressEntry():
-                by_uuid[jsonl_entry.uuid] = jsonl_entry
-                last_uuid = jsonl_entry.uuid
+        if isinstance(jsonl_entry, _THREAD_ENTRY_TYPES):
+            by_uuid[jsonl_entry.uuid] = jsonl_entry
+            last_uuid = jsonl_entry.uuid
+            if last_uuid == leaf_uuid:
+                break
 
     target = leaf_uuid or last_uuid
     if target is None:
@@ -534,11 +536,7 @@ def _resolve_thread(
         if entry is None:
             break
         chain.append(entry)
-        match entry:
-            case ClaudeUserEntry() | ClaudeAssistantEntry() | ClaudeProgressEntry():
-                current = entry.parent_uuid
-            case _:
-                current = None
+        current = entry.parent_uuid
 
     chain.reverse()
     return chain
@@ -549,13 +547,8 @@ def _filter_sidechains(
 ) -> Iterator[ClaudeJSONLEntry]:
     """Filter out sidechain entries."""
     for entry in entries:
-        match entry:
-            case ClaudeUserEntry(is_sidechain=True) | ClaudeAssistantEntry(is_sidechain=True):
-                continue
-            case ClaudeProgressEntry(is_sidechain=True):
-                continue
-            case _:
-                yield entry
+        if not getattr(entry, "is_sidechain", False):
+            yield entry
 
 
 def replay_entries(
@@ -574,7 +567,7 @@ def replay_entries(
     the one-entry-per-content-block granularity of the storage format.
 
     Args:
-        entries: JSONL entries to replay (from read_session or similar).
+        entries: JSONL entries to replay (from iter_session, read_session or similar).
         include_progress: If True, also yield ToolProgressMessage for
             tool_progress entries.
         include_stream_events: If True, inject synthetic StreamEvent
@@ -601,7 +594,7 @@ def replay_entries(
         StreamEvent, ResultMessage, and optionally ToolProgressMessage).
     """
     if leaf_uuid is not None:
-        entries = _resolve_thread(list(entries), leaf_uuid=leaf_uuid)
+        entries = _resolve_thread(entries, leaf_uuid=leaf_uuid)
     if exclude_sidechains:
         entries = _filter_sidechains(entries)
     if include_stream_events:
@@ -653,7 +646,16 @@ def replay_session(
     Yields:
         Wire-format Message objects in conversation order.
     """
-    entries = read_session(session_path)
+    entry_types: set[str] | None = None
+    if not include_stream_events and leaf_uuid is None:
+        # Basic replay ignores every other entry type, and without stream events or
+        # thread resolution their position does not matter, so skip validating them.
+        entry_types = {"user", "assistant"}
+        if include_progress:
+            entry_types.add("progress")
+        if include_summaries:
+            entry_types.add("summary")
+    entries = iter_session(session_path, entry_types=entry_types)
     yield from replay_entries(
         entries,
         include_progress=include_progress,
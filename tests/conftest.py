@@ -1,10 +1,21 @@
 """Pytest configuration for tests."""
 
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import json
 import os
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import pytest
 
+from clawd_code_sdk._internal.transport import Transport
+
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Mapping, Sequence
+
 
 _MSG_COUNTER = 0
 
@@ -30,6 +41,88 @@ def make_beta_message(
     }
 
 
+_INIT_RESPONSE = {
+    "subtype": "success",
+    "response": {
+        "commands": [],
+        "outputStyle": "default",
+        "pid": 12345,
+    },
+}
+
+
+class FakeTransport(Transport):
+    """In-memory transport that answers control requests and replays messages.
+
+    Replies are queued by ``write`` and drained by ``read_messages``, so the reader
+    only wakes when the SDK has actually sent something.
+
+    Args:
+        messages: Message dicts to return after initialization.
+        control_responses: Mapping of control request subtype to response payload.
+            The "initialize" subtype is handled automatically. Without extra
+            responses, the stream ends once ``messages`` have been yielded.
+    """
+
+    idle_timeout = 0.5
+    """Seconds the reader waits for the SDK to write before failing the test."""
+
+    def __init__(
+        self,
+        messages: Sequence[dict[str, Any]] = (),
+        control_responses: Mapping[str, dict[str, Any]] | None = None,
+    ) -> None:
+        self._responses = {"initialize": _INIT_RESPONSE, **(control_responses or {})}
+        self._messages = messages
+        self._keep_open = control_responses is not None
+        self._outbox: deque[dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+        self._finished = False
+        self.written_messages: list[dict[str, Any]] = []
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def end_input(self) -> None:
+        pass
+
+    async def write(self, data: str) -> None:
+        msg = json.loads(data)
+        self.written_messages.append(msg)
+        if msg["type"] != "control_request":
+            return
+        subtype = msg["request"]["subtype"]
+        if (payload := self._responses.get(subtype)) is not None:
+            response = {"request_id": msg["request_id"], **payload}
+            self._outbox.append({"type": "control_response", "response": response})
+        if subtype == "initialize":
+            self._outbox.extend(self._messages)
+            self._finished = not self._keep_open
+        self._ready.set()
+
+    async def read_messages(self) -> AsyncIterator[dict[str, Any]]:
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=self.idle_timeout)
+            except TimeoutError:
+                msg = f"SDK sent no control request within {self.idle_timeout}s"
+                raise TimeoutError(msg) from None
+            self._ready.clear()
+            while self._outbox:
+                yield self._outbox.popleft()
+            if self._finished:
+                return
+
+
+@pytest.fixture(scope="session")
+def make_transport():
+    """Factory for fake transports replaying a fixed list of messages."""
+    return FakeTransport
+
+
 @pytest.fixture(scope="session", autouse=True)
 def unset_anthropic_api_key():
     os.environ["ANTHROPIC_API_KEY"] = ""
@@ -2,12 +2,8 @@
 
 from __future__ import annotations
 
-import asyncio
-import json
 from typing import TYPE_CHECKING
-from unittest.mock import AsyncMock
 
-import anyio
 import pytest
 
 from clawd_code_sdk import (
@@ -85,445 +81,224 @@ def _make_result(
     return msg.model_dump()
 
 
-def create_mock_transport_with_messages(messages: list[dict]):
-    """Create a mock transport that handles initialization and returns messages.
-
-    Args:
-        messages: List of message dicts to return after initialization
-    """
-    mock_transport = AsyncMock()
-    mock_transport.connect = AsyncMock()
-    mock_transport.close = AsyncMock()
-    mock_transport.end_input = AsyncMock()
-
-    # Track written messages to simulate control protocol responses
-    written_messages: list[str] = []
-
-    async def mock_write(data: str) -> None:
-        written_messages.append(data)
-
-    mock_transport.write = AsyncMock(side_effect=mock_write)
-
-    async def mock_receive():
-        # Wait for initialization request
-        await asyncio.sleep(0.01)
-
-        # Find and respond to initialization request
-        for msg_str in written_messages:
-            try:
-                msg = json.loads(msg_str.strip())
-                if (
-                    msg.get("type") == "control_request"
-                    and msg.get("request", {}).get("subtype") == "initialize"
-                ):
-                    yield {
-                        "type": "control_response",
-                        "response": {
-                            "request_id": msg.get("request_id"),
-                            "subtype": "success",
-                            "response": {
-                                "commands": [],
-                                "outputStyle": "default",
-                                "pid": 12345,
-                            },
-                        },
-                    }
-                    break
-            except (json.JSONDecodeError, KeyError, AttributeError):
-                pass
-
-        # Yield all messages
-        for message in messages:
-            yield message
+_SONNET = "claude-sonnet-4-5-20250514"
 
-    mock_transport.read_messages = mock_receive
-    return mock_transport
+# Shared default result payload; the SDK only reads incoming message dicts.
+_RESULT_OK = _make_result()
 
 
 class TestQueryFunction:
     """Test the main query function."""
 
-    def test_query_single_prompt(self):
+    async def test_query_single_prompt(self, make_transport):
         """Test query with a single prompt."""
-
-        async def _test():
-            test_messages = [
-                {
-                    "type": "assistant",
-                    "message": make_beta_message(
-                        content=[{"type": "text", "text": "4"}],
-                    ),
-                },
-                _make_result(),
-            ]
-            mock_transport = create_mock_transport_with_messages(test_messages)
-            messages = [
-                msg
-                async for msg in ClaudeSDKClient.one_shot("What is 2+2?", transport=mock_transport)
-            ]
-            assert len(messages) == 2
-            assert isinstance(messages[0], AssistantMessage)
-            assert isinstance(messages[0].content[0], TextBlock)
-            assert messages[0].content[0].text == "4"
-
-        anyio.run(_test)
-
-    def test_query_with_options(self):
-        """Test query with various options."""
-
-        async def _test():
-            test_messages = [
-                {
-                    "type": "assistant",
-                    "message": make_beta_message(
-                        content=[{"type": "text", "text": "Hello!"}],
-                    ),
-                },
-                _make_result(),
-            ]
-            mock_transport = create_mock_transport_with_messages(test_messages)
-            options = ClaudeAgentOptions(
-                allowed_tools=["Read", "Write"],
-                system_prompt="You are helpful",
-                permission_mode="acceptEdits",
-                max_turns=5,
-            )
-            messages = [
-                msg
-                async for msg in ClaudeSDKClient.one_shot(
-                    "Hi", options=options, transport=mock_transport
-                )
-            ]
-            assert len(messages) == 2
-            assert isinstance(messages[0], AssistantMessage)
-            assert isinstance(messages[0].content[0], TextBlock)
-            assert messages[0].content[0].text == "Hello!"
-
-        anyio.run(_test)
-
-    def test_query_with_cwd(self):
-        """Test query with custom working directory."""
-
-        async def _test():
-            test_messages = [
-                {
-                    "type": "assistant",
-                    "message": make_beta_message(
-                        content=[{"type": "text", "text": "Done"}],
-                    ),
-                },
-                _make_result(),
-            ]
-            mock_transport = create_mock_transport_with_messages(test_messages)
-            options = ClaudeAgentOptions(cwd="/custom/path")
-            messages = [
-                i
-                async for i in ClaudeSDKClient.one_shot(
-                    "test", options=options, transport=mock_transport
-                )
-            ]
-            assert len(messages) == 2
-            assert isinstance(messages[0], AssistantMessage)
-            assert isinstance(messages[0].content[0], TextBlock)
-            assert messages[0].content[0].text == "Done"
-
-        anyio.run(_test)
-
-
-class TestAPIErrorRaising:
-    """Test that API errors are raised as exceptions."""
-
-    def test_invalid_request_error_raised(self):
-        """Test that invalid_request errors are raised as InvalidRequestError."""
-
-        async def _test():
-            error_message = {
+        test_messages = [
+            {
                 "type": "assistant",
-                "error": "invalid_request",
                 "message": make_beta_message(
-                    content=[
-                        {
-                            "type": "text",
-                            "text": "API Error: The provided model identifier is invalid.",
-                        }
-                    ],
-                    model="claude-invalid-model",
+                    content=[{"type": "text", "text": "4"}],
                 ),
-            }
-            mock_transport = create_mock_transport_with_messages([error_message])
-
-            with pytest.raises(InvalidRequestError) as exc_info:
-                async for _ in ClaudeSDKClient.one_shot("test", transport=mock_transport):
-                    pass
-
-            assert exc_info.value.error_type == "invalid_request"
-            assert exc_info.value.model == "claude-invalid-model"
-            assert "model identifier" in str(exc_info.value).lower()
-
-        anyio.run(_test)
-
-    def test_rate_limit_error_raised(self):
-        """Test that rate_limit errors are raised as RateLimitError."""
-
-        async def _test():
-            error_message = {
-                "type": "assistant",
-                "error": "rate_limit",
-                "message": make_beta_message(
-                    content=[
-                        {
-                            "type": "text",
-                            "text": "API Error: Rate limit exceeded",
-                        }
-                    ],
-                    model="claude-sonnet-4-5-20250514",
-                ),
-            }
-            mock_transport = create_mock_transport_with_messages([error_message])
-
-            with pytest.raises(RateLimitError) as exc_info:
-                async for _ in ClaudeSDKClient.one_shot("test", transport=mock_transport):
-                    pass
-
-            assert exc_info.value.error_type == "rate_limit"
-
-        anyio.run(_test)
-
-    def test_authentication_error_raised(self):
-        """Test that authentication_failed errors are raised as AuthenticationError."""
-
-        async def _test():
-            error_message = {
+            },
+            _RESULT_OK,
+        ]
+        mock_transport = make_transport(test_messages)
+        messages = [
+            msg async for msg in ClaudeSDKClient.one_shot("What is 2+2?", transport=mock_transport)
+        ]
+        assert len(messages) == 2
+        assert isinstance(messages[0], AssistantMessage)
+        assert isinstance(messages[0].content[0], TextBlock)
+        assert messages[0].content[0].text == "4"
+
+    async def test_query_with_options(self, make_transport):
+        """Test query with various options."""
+        test_messages = [
+            {
                 "type": "assistant",
-                "error": "authentication_failed",
                 "message": make_beta_message(
-                    content=[{"type": "text", "text": "API Error: Invalid API key"}],
-                    model="claude-sonnet-4-5-20250514",
+                    content=[{"type": "text", "text": "Hello!"}],
                 ),
-            }
-            mock_transport = create_mock_transport_with_messages([error_message])
-
-            with pytest.raises(AuthenticationError) as exc_info:
-                async for _ in ClaudeSDKClient.one_shot("test", transport=mock_transport):
-                    pass
-
-            assert exc_info.value.error_type == "authentication_failed"
-
-        anyio.run(_test)
-
-    def test_server_error_raised(self):
-        """Test that server_error errors are raised as ServerError (529 Overloaded)."""
+            },
+            _RESULT_OK,
+        ]
+        mock_transport = make_transport(test_messages)
+        options = ClaudeAgentOptions(
+            allowed_tools=["Read", "Write"],
+            system_prompt="You are helpful",
+            permission_mode="acceptEdits",
+            max_turns=5,
+        )
+        messages = [
+            msg
+            async for msg in ClaudeSDKClient.one_shot(
+                "Hi", options=options, transport=mock_transport
+            )
+        ]
+        assert len(messages) == 2
+        assert isinstance(messages[0], AssistantMessage)
+        assert isinstance(messages[0].content[0], TextBlock)
+        assert messages[0].content[0].text == "Hello!"
 
-        async def _test():
-            error_message = {
+    async def test_query_with_cwd(self, make_transport):
+        """Test query with custom working directory."""
+        test_messages = [
+            {
                 "type": "assistant",
-                "error": "server_error",
                 "message": make_beta_message(
-                    content=[
-                        {
-                            "type": "text",
-                            "text": "API Error: Repeated 529 Overloaded errors",
-                        }
-                    ],
-                    model="claude-sonnet-4-5-20250514",
+                    content=[{"type": "text", "text": "Done"}],
                 ),
-            }
-            mock_transport = create_mock_transport_with_messages([error_message])
+            },
+            _RESULT_OK,
+        ]
+        mock_transport = make_transport(test_messages)
+        options = ClaudeAgentOptions(cwd="/custom/path")
+        messages = [
+            i
+            async for i in ClaudeSDKClient.one_shot(
+                "test", options=options, transport=mock_transport
+            )
+        ]
+        assert len(messages) == 2
+        assert isinstance(messages[0], AssistantMessage)
+        assert isinstance(messages[0].content[0], TextBlock)
+        assert messages[0].content[0].text == "Done"
 
-            with pytest.raises(ServerError) as exc_info:
-                async for _ in ClaudeSDKClient.one_shot("test", transport=mock_transport):
-                    pass
 
-            assert exc_info.value.error_type == "server_error"
+class TestAPIErrorRaising:
+    """Test that API errors are raised as exceptions."""
 
-        anyio.run(_test)
+    @pytest.mark.parametrize(
+        ("error", "error_cls", "text", "model"),
+        [
+            (
+                "invalid_request",
+                InvalidRequestError,
+                "API Error: The provided model identifier is invalid.",
+                "claude-invalid-model",
+            ),
+            ("rate_limit", RateLimitError, "API Error: Rate limit exceeded", _SONNET),
+            ("authentication_failed", AuthenticationError, "API Error: Invalid API key", _SONNET),
+            ("server_error", ServerError, "API Error: Repeated 529 Overloaded errors", _SONNET),
+            ("unknown", APIError, "Unknown error", _SONNET),
+        ],
+    )
+    async def test_api_error_raised(
+        self,
+        make_transport,
+        error: str,
+        error_cls: type[APIError],
+        text: str,
+        model: str,
+    ):
+        """Test that assistant errors are raised as the matching APIError subclass."""
+        error_message = {
+            "type": "assistant",
+            "error": error,
+            "message": make_beta_message(content=[{"type": "text", "text": text}], model=model),
+        }
+        mock_transport = make_transport([error_message])
+
+        with pytest.raises(error_cls) as exc_info:
+            async for _ in ClaudeSDKClient.one_shot("test", transport=mock_transport):
+                pass
 
-    def test_unknown_error_raised_as_base(self):
-        """Test that unknown error types are raised as base APIError."""
+        assert type(exc_info.value) is error_cls
+        assert exc_info.value.error_type == error
+        assert exc_info.value.model == model
+        assert text in str(exc_info.value)
 
-        async def _test():
-            error_message = {
+    async def test_messages_without_error_pass_through(self, make_transport):
+        """Test that normal messages without errors are yielded normally."""
+        test_messages = [
+            {
                 "type": "assistant",
-                "error": "unknown",
                 "message": make_beta_message(
-                    content=[{"type": "text", "text": "Unknown error"}],
+                    content=[{"type": "text", "text": "Hello!"}],
                     model="claude-sonnet-4-5-20250514",
                 ),
-            }
-            mock_transport = create_mock_transport_with_messages([error_message])
-
-            with pytest.raises(APIError) as exc_info:
-                async for _ in ClaudeSDKClient.one_shot("test", transport=mock_transport):
-                    pass
-
-            assert exc_info.value.error_type == "unknown"
-
-        anyio.run(_test)
-
-    def test_messages_without_error_pass_through(self):
-        """Test that normal messages without errors are yielded normally."""
-
-        async def _test():
-            test_messages = [
-                {
-                    "type": "assistant",
-                    "message": make_beta_message(
-                        content=[{"type": "text", "text": "Hello!"}],
-                        model="claude-sonnet-4-5-20250514",
-                    ),
-                },
-                _make_result(uuid="msg-002"),
-            ]
-            mock_tp = create_mock_transport_with_messages(test_messages)
-            messages = [msg async for msg in ClaudeSDKClient.one_shot("test", transport=mock_tp)]
-            assert len(messages) == 2
-            assert isinstance(messages[0], AssistantMessage)
-            assert isinstance(messages[0].content[0], TextBlock)
-            assert messages[0].content[0].text == "Hello!"
-
-        anyio.run(_test)
-
-
-def _create_control_protocol_transport(
-    control_responses: dict[str, dict],
-) -> AsyncMock:
-    """Create a mock transport that handles initialization and responds to control requests.
-
-    Args:
-        control_responses: Mapping of control request subtype to response payload.
-            The "initialize" subtype is handled automatically.
-    """
-    mock_transport = AsyncMock()
-    mock_transport.connect = AsyncMock()
-    mock_transport.close = AsyncMock()
-    mock_transport.end_input = AsyncMock()
-
-    written_messages: list[str] = []
-
-    async def mock_write(data: str) -> None:
-        written_messages.append(data)
-
-    mock_transport.write = AsyncMock(side_effect=mock_write)
-
-    init_response = {
-        "subtype": "success",
-        "response": {
-            "commands": [],
-            "outputStyle": "default",
-            "pid": 12345,
-        },
-    }
-    all_responses = {"initialize": init_response, **control_responses}
-
-    async def mock_receive():
-        last_check = 0
-        timeout_counter = 0
-        while timeout_counter < 200:
-            await asyncio.sleep(0.01)
-            timeout_counter += 1
-
-            for msg_str in written_messages[last_check:]:
-                try:
-                    msg = json.loads(msg_str.strip())
-                    if msg.get("type") != "control_request":
-                        continue
-                    subtype = msg.get("request", {}).get("subtype")
-                    if subtype in all_responses:
-                        yield {
-                            "type": "control_response",
-                            "response": {
-                                "request_id": msg.get("request_id"),
-                                **all_responses[subtype],
-                            },
-                        }
-                except (json.JSONDecodeError, KeyError, AttributeError):
-                    pass
-            last_check = len(written_messages)
-
-    mock_transport.read_messages = mock_receive
-    return mock_transport
+            },
+            _make_result(uuid="msg-002"),
+        ]
+        mock_tp = make_transport(test_messages)
+        messages = [msg async for msg in ClaudeSDKClient.one_shot("test", transport=mock_tp)]
+        assert len(messages) == 2
+        assert isinstance(messages[0], AssistantMessage)
+        assert isinstance(messages[0].content[0], TextBlock)
+        assert messages[0].content[0].text == "Hello!"
 
 
 class TestGetMcpStatus:
     """Test get_mcp_status returns validated McpStatusResponse."""
 
-    def test_get_mcp_status_parses_response(self):
+    async def test_get_mcp_status_parses_response(self, make_transport):
         """Test that get_mcp_status returns a validated McpStatusResponse."""
+        mcp_status_payload = {
+            "subtype": "success",
+            "response": {
+                "mcpServers": [
+                    {
+                        "name": "git",
+                        "status": "connected",
+                        "serverInfo": {"name": "mcp-git", "version": "1.26.0"},
+                        "config": {
+                            "type": "stdio",
+                            "command": "uvx",
+                            "args": ["mcp-server-git"],
+                        },
+                        "scope": "dynamic",
+                        "tools": [
+                            {"name": "git_status", "annotations": {}},
+                            {"name": "git_log", "annotations": {}},
+                        ],
+                    }
+                ]
+            },
+        }
+        mock_transport = make_transport(control_responses={"mcp_status": mcp_status_payload})
+
+        client = ClaudeSDKClient(transport=mock_transport)
+        await client.connect()
+        try:
+            status = await client.get_mcp_status()
+
+            assert isinstance(status, list)
+            assert len(status) == 1
+
+            server = status[0]
+            assert isinstance(server, McpServerStatusEntry)
+            assert server.name == "git"
+            assert server.status == "connected"
+            assert server.scope == "dynamic"
+            assert server.server_info is not None
+            assert server.server_info.name == "mcp-git"
+            assert server.server_info.version == "1.26.0"
+            assert server.config == McpStdioServerConfig(
+                command="uvx",
+                args=["mcp-server-git"],
+            )
+            assert len(server.tools) == 2
+            assert server.tools[0].name == "git_status"
+            assert server.tools[1].name == "git_log"
+        finally:
+            await client.disconnect()
 
-        async def _test():
-            mcp_status_payload = {
-                "subtype": "success",
-                "response": {
-                    "mcpServers": [
-                        {
-                            "name": "git",
-                            "status": "connected",
-                            "serverInfo": {"name": "mcp-git", "version": "1.26.0"},
-                            "config": {
-                                "type": "stdio",
-                                "command": "uvx",
-                                "args": ["mcp-server-git"],
-                            },
-                            "scope": "dynamic",
-                            "tools": [
-                                {"name": "git_status", "annotations": {}},
-                                {"name": "git_log", "annotations": {}},
-                            ],
-                        }
-                    ]
-                },
-            }
-            mock_transport = _create_control_protocol_transport({"mcp_status": mcp_status_payload})
-
-            client = ClaudeSDKClient(transport=mock_transport)
-            await client.connect()
-            try:
-                status = await client.get_mcp_status()
-
-                assert isinstance(status, list)
-                assert len(status) == 1
-
-                server = status[0]
-                assert isinstance(server, McpServerStatusEntry)
-                assert server.name == "git"
-                assert server.status == "connected"
-                assert server.scope == "dynamic"
-                assert server.server_info is not None
-                assert server.server_info.name == "mcp-git"
-                assert server.server_info.version == "1.26.0"
-                assert server.config == McpStdioServerConfig(
-                    command="uvx",
-                    args=["mcp-server-git"],
-                )
-                assert len(server.tools) == 2
-                assert server.tools[0].name == "git_status"
-                assert server.tools[1].name == "git_log"
-            finally:
-                await client.disconnect()
-
-        anyio.run(_test)
-
-    def test_get_mcp_status_empty_servers(self):
+    async def test_get_mcp_status_empty_servers(self, make_transport):
         """Test get_mcp_status with no MCP servers configured."""
-
-        async def _test():
-            mcp_status_payload = {
-                "subtype": "success",
-                "response": {"mcpServers": []},
-            }
-            mock_transport = _create_control_protocol_transport({"mcp_status": mcp_status_payload})
-
-            client = ClaudeSDKClient(transport=mock_transport)
-            await client.connect()
-            try:
-                status = await client.get_mcp_status()
-
-                assert isinstance(status, list)
-                assert len(status) == 0
-            finally:
-                await client.disconnect()
-
-        anyio.run(_test)
+        mcp_status_payload = {
+            "subtype": "success",
+            "response": {"mcpServers": []},
+        }
+        mock_transport = make_transport(control_responses={"mcp_status": mcp_status_payload})
+
+        client = ClaudeSDKClient(transport=mock_transport)
+        await client.connect()
+        try:
+            status = await client.get_mcp_status()
+
+            assert isinstance(status, list)
+            assert len(status) == 0
+        finally:
+            await client.disconnect()
 
 
 if __name__ == "__main__":
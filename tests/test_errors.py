@@ -1,5 +1,7 @@
 """Tests for Claude SDK error handling."""
 
+import pytest
+
 from clawd_code_sdk import (
     APIError,
     AuthenticationError,
@@ -108,25 +110,20 @@ class TestAPIErrors:
         assert error.model is None  # Model is optional
         assert "529 Overloaded" in str(error)
 
-    def test_api_errors_are_catchable_by_base_class(self):
+    @pytest.mark.parametrize(
+        "error_cls",
+        [AuthenticationError, BillingError, RateLimitError, InvalidRequestError, ServerError],
+        ids=lambda cls: cls.__name__,
+    )
+    def test_api_errors_are_catchable_by_base_class(self, error_cls: type[APIError]):
         """Test that all API errors can be caught by APIError or ClaudeSDKError."""
-        errors = [
-            AuthenticationError("auth failed"),
-            BillingError("billing issue"),
-            RateLimitError("rate limited"),
-            InvalidRequestError("bad request"),
-            ServerError("server error"),
-        ]
-
-        for error in errors:
-            # Should be catchable by APIError
-            try:
-                raise error
-            except APIError as e:
-                assert e.error_type is not None  # noqa: PT017
-
-            # Should also be catchable by ClaudeSDKError
-            try:
-                raise error
-            except ClaudeSDKError:
-                pass  # Successfully caught
+        error = error_cls("request failed")
+
+        # Should be catchable by APIError
+        with pytest.raises(APIError) as exc_info:
+            raise error
+        assert exc_info.value.error_type is not None
+
+        # Should also be catchable by ClaudeSDKError
+        with pytest.raises(ClaudeSDKError):
+            raise error
@@ -0,0 +1,301 @@
+"""Tests for the Claude Code storage models and session replay."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from pydantic import TypeAdapter
+import pytest
+
+from clawd_code_sdk.models import ResultMessage, StreamEvent
+from clawd_code_sdk.storage.helpers import read_session
+from clawd_code_sdk.storage.models import ClaudeAssistantEntry, ClaudeJSONLEntry, ClaudeUserEntry
+from clawd_code_sdk.storage.replay import replay_entries, replay_session
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from clawd_code_sdk.models import Message
+
+
+_SESSION_ID = "11111111-1111-1111-1111-111111111111"
+_ADAPTER = TypeAdapter[ClaudeJSONLEntry](ClaudeJSONLEntry)
+
+
+def _user(
+    uuid: str,
+    content: str | list[dict[str, Any]],
+    *,
+    parent: str | None = None,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """Build a stored user entry in on-disk (camelCase) form."""
+    return {
+        "type": "user",
+        "uuid": uuid,
+        "parentUuid": parent,
+        "sessionId": _SESSION_ID,
+        "timestamp": "2025-01-01T00:00:00.000Z",
+        "message": {"role": "user", "content": content},
+        **kwargs,
+    }
+
+
+def _assistant(
+    uuid: str,
+    msg_id: str,
+    block: dict[str, Any],
+    *,
+    parent: str | None = None,
+    stop_reason: str | None = None,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """Build a stored assistant entry holding a single content block."""
+    return {
+        "type": "assistant",
+        "uuid": uuid,
+        "parentUuid": parent,
+        "sessionId": _SESSION_ID,
+        "timestamp": "2025-01-01T00:00:00.000Z",
+        "message": {
+            "model": "claude-sonnet-4-5",
+            "id": msg_id,
+            "type": "message",
+            "role": "assistant",
+            "content": [block],
+            "stop_reason": stop_reason,
+            "usage": {"input_tokens": 10, "output_tokens": 5},
+        },
+        **kwargs,
+    }
+
+
+def _tool_use(tool_use_id: str = "toolu_1") -> dict[str, Any]:
+    return {"type": "tool_use", "id": tool_use_id, "name": "Read", "input": {"path": "a.py"}}
+
+
+def _tool_result(tool_use_id: str = "toolu_1") -> dict[str, Any]:
+    return {"type": "tool_result", "tool_use_id": tool_use_id, "content": "ok"}
+
+
+def _text(text: str) -> dict[str, Any]:
+    return {"type": "text", "text": text}
+
+
+def _write_session(path: Path, raw_entries: Iterable[dict[str, Any]]) -> Path:
+    """Write entries as a JSONL session file and return its path."""
+    path.write_text("".join(json.dumps(e) + "\n" for e in raw_entries), encoding="utf-8")
+    return path
+
+
+def _kinds(messages: Iterable[Message]) -> list[str]:
+    """Reduce replayed messages to their type (or stream event type)."""
+    return [m.event.type if isinstance(m, StreamEvent) else m.type for m in messages]
+
+
+def _uuids(messages: Iterable[Message]) -> list[str]:
+    """UUIDs of the replayed non-stream-event messages, in order."""
+    return [m.uuid for m in messages if not isinstance(m, StreamEvent)]
+
+
+# One turn with a two-block assistant message (text + tool_use), a progress entry and
+# a tool_result, a final answer, plus entries replay ignores or filters out.
+_CONVERSATION = [
+    {"type": "queue-operation", "operation": "dequeue", "sessionId": _SESSION_ID, "timestamp": "t"},
+    _user("u1", "Read a.py"),
+    _assistant("a1", "msg_1", _text("Let me read it."), parent="u1"),
+    _assistant("a2", "msg_1", _tool_use(), parent="a1", stop_reason="tool_use"),
+    {
+        "type": "progress",
+        "uuid": "p1",
+        "parentUuid": "a2",
+        "sessionId": _SESSION_ID,
+        "timestamp": "t",
+        "data": {"type": "tool_progress", "tool_use_id": "toolu_1", "tool_name": "Read"},
+    },
+    _user("u2", [_tool_result()], parent="p1"),
+    _assistant("a3", "msg_2", _text("Done."), parent="u2", stop_reason="end_turn"),
+    {"type": "summary", "leafUuid": "a3", "summary": "Read a file"},
+    _user("s1", "Explore the repo", isSidechain=True),
+]
+
+# Two sibling user prompts forking from the same assistant reply.
+_BRANCHED = [
+    _user("u1", "Hi"),
+    _assistant("a1", "msg_1", _text("Hello"), parent="u1"),
+    _user("u2", "Option A", parent="a1"),
+    _user("u3", "Option B", parent="a1"),
+    _assistant("a2", "msg_2", _text("B it is"), parent="u3"),
+]
+
+
+class TestClaudeUserEntry:
+    """Test ClaudeUserEntry classification."""
+
+    @pytest.mark.parametrize(
+        ("content", "expected"),
+        [
+            pytest.param("Hello", False, id="string"),
+            pytest.param([{"type": "text", "text": "Hello"}], False, id="text_block"),
+            pytest.param([_tool_result()], True, id="tool_result"),
+            pytest.param([_tool_result("a"), _tool_result("b")], True, id="tool_results"),
+            pytest.param([_tool_result(), {"type": "text", "text": "and more"}], False, id="mixed"),
+            pytest.param([], False, id="empty"),
+        ],
+    )
+    def test_is_tool_result(self, content: str | list[dict[str, Any]], expected: bool):
+        """Only non-empty content made up entirely of tool_result blocks counts."""
+        entry = ClaudeUserEntry.model_validate(_user("u1", content))
+        assert entry.is_tool_result is expected
+
+
+class TestReplayStreamEvents:
+    """Test synthetic stream events produced by replay_entries()."""
+
+    def test_tool_use_delta_uses_stdlib_json_format(self):
+        """Tool input deltas keep json.dumps' default separators."""
+        entry = ClaudeAssistantEntry.model_validate(_assistant("a1", "msg_1", _tool_use()))
+        messages = list(replay_entries([entry], include_stream_events=True))
+        deltas = [
+            m.event.delta
+            for m in messages
+            if isinstance(m, StreamEvent) and m.event.type == "content_block_delta"
+        ]
+        assert [d.partial_json for d in deltas] == ['{"path": "a.py"}']  # type: ignore[union-attr]
+
+
+class TestReplayResult:
+    """Test synthetic ResultMessage reconstruction."""
+
+    def test_usage_is_deduplicated_by_message_id(self):
+        """Usage repeated across blocks of one API message is only counted once."""
+        raw = [
+            _user("u1", "Hi"),
+            _assistant("a1", "msg_1", {"type": "text", "text": "Hello"}, parent="u1"),
+            _assistant("a2", "msg_1", _tool_use(), parent="a1"),
+            _user("u2", [_tool_result()], parent="a2"),
+            _assistant("a3", "msg_2", {"type": "text", "text": "Done"}, parent="u2"),
+        ]
+        entries = [_ADAPTER.validate_python(e) for e in raw]
+        results = [
+            m for m in replay_entries(entries, include_result=True) if isinstance(m, ResultMessage)
+        ]
+        assert len(results) == 1
+        assert results[0].num_turns == 2
+        assert (results[0].usage.input_tokens, results[0].usage.output_tokens) == (20, 10)
+
+
+class TestReplaySession:
+    """Test replay_session() against JSONL session files."""
+
+    def test_stream_events_group_blocks_by_message_id(self, tmp_path: Path):
+        """Consecutive entries of one API message share one message envelope."""
+        path = _write_session(tmp_path / "session.jsonl", _CONVERSATION)
+        messages = list(replay_session(path, include_stream_events=True, exclude_sidechains=True))
+        assert _kinds(messages) == [
+            "user",
+            "message_start",
+            "content_block_start",
+            "content_block_delta",
+            "assistant",
+            "content_block_stop",
+            "content_block_start",
+            "content_block_delta",
+            "assistant",
+            "content_block_stop",
+            "message_delta",
+            "user",
+            "message_stop",
+            "message_start",
+            "content_block_start",
+            "content_block_delta",
+            "assistant",
+            "content_block_stop",
+            "message_delta",
+            "message_stop",
+        ]
+        events = [m.event for m in messages if isinstance(m, StreamEvent)]
+        assert [e.message.id for e in events if e.type == "message_start"] == ["msg_1", "msg_2"]
+        assert [e.index for e in events if e.type == "content_block_start"] == [0, 1, 0]
+        assert [e.delta.stop_reason for e in events if e.type == "message_delta"] == [
+            "tool_use",
+            "end_turn",
+        ]
+
+    def test_tool_result_trailer_includes_progress(self, tmp_path: Path):
+        """Progress and tool_result entries after a group are emitted before message_stop."""
+        path = _write_session(tmp_path / "session.jsonl", _CONVERSATION)
+        messages = list(
+            replay_session(
+                path,
+                include_stream_events=True,
+                include_progress=True,
+                include_result=True,
+                exclude_sidechains=True,
+            )
+        )
+        kinds = _kinds(messages)
+        first_stop = kinds.index("message_stop")
+        assert kinds[first_stop - 3 : first_stop] == ["message_delta", "tool_progress", "user"]
+        # The tool_result belongs to the turn, so only one result closes it
+        assert kinds.count("result") == 1
+        assert kinds[-1] == "result"
+
+    @pytest.mark.parametrize("include_stream_events", [False, True])
+    @pytest.mark.parametrize(
+        ("leaf_uuid", "expected"),
+        [
+            pytest.param("u2", ["u1", "a1", "u2"], id="leaf"),
+            pytest.param(None, ["u1", "a1", "u2", "u3", "a2"], id="no_leaf"),
+            pytest.param("missing", [], id="leaf_not_found"),
+        ],
+    )
+    def test_leaf_uuid(
+        self,
+        tmp_path: Path,
+        leaf_uuid: str | None,
+        expected: list[str],
+        include_stream_events: bool,
+    ):
+        """leaf_uuid replays only its thread; without it the whole file is replayed."""
+        path = _write_session(tmp_path / "session.jsonl", _BRANCHED)
+        messages = replay_session(
+            path, leaf_uuid=leaf_uuid, include_stream_events=include_stream_events
+        )
+        assert _uuids(messages) == expected
+
+    @pytest.mark.parametrize("include_stream_events", [False, True])
+    def test_exclude_sidechains(self, tmp_path: Path, include_stream_events: bool):
+        """Sidechain entries are only replayed when not excluded."""
+        path = _write_session(tmp_path / "session.jsonl", _CONVERSATION)
+        kept = replay_session(path, include_stream_events=include_stream_events)
+        assert "s1" in _uuids(kept)
+        filtered = replay_session(
+            path, include_stream_events=include_stream_events, exclude_sidechains=True
+        )
+        assert _uuids(filtered) == ["u1", "a1", "a2", "u2", "a3"]
+
+    @pytest.mark.parametrize("include_stream_events", [False, True])
+    @pytest.mark.parametrize("include_progress", [False, True])
+    @pytest.mark.parametrize("include_summaries", [False, True])
+    def test_matches_replay_of_all_entries(
+        self,
+        tmp_path: Path,
+        include_stream_events: bool,
+        include_progress: bool,
+        include_summaries: bool,
+    ):
+        """Skipping unused entry types while reading does not change the replay."""
+        path = _write_session(tmp_path / "session.jsonl", _CONVERSATION)
+        options = {
+            "include_stream_events": include_stream_events,
+            "include_progress": include_progress,
+            "include_summaries": include_summaries,
+            "include_result": True,
+        }
+        expected = list(replay_entries(read_session(path), **options))
+        assert list(replay_session(path, **options)) == expected
+        assert ("tool_progress" in _kinds(expected)) is include_progress
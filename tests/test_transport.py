@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
+import itertools
 import json
 import os
 from pathlib import Path
@@ -25,9 +26,24 @@ from clawd_code_sdk.models import (
     Network,
     Permissions,
     Sandbox,
+    ThinkingConfigAdaptive,
+    ThinkingConfigDisabled,
+    ThinkingConfigEnabled,
 )
 
 
+def _make_process_mocks() -> tuple[MagicMock, MagicMock]:
+    """Create mocks for the version-check process and the main CLI process."""
+    version_process = MagicMock()
+    version_process.stdout.receive = AsyncMock(return_value=b"2.0.0 (Claude Code)")
+    version_process.wait = AsyncMock()
+    process = MagicMock()
+    process.returncode = None
+    process.wait = AsyncMock()
+    process.stdin.aclose = AsyncMock()
+    return version_process, process
+
+
 class TestSubprocessCLITransport:
     """Test subprocess transport implementation."""
 
@@ -39,23 +55,24 @@ class TestSubprocessCLITransport:
             transport._cli_path = "/usr/bin/claude"
         return transport
 
-    def test_find_cli_not_found(self):
+    @classmethod
+    def _build_cmd(cls, options: ClaudeAgentOptions | None = None) -> list[str]:
+        """Build the CLI command for the given options."""
+        return cls._make_transport(options=options)._build_command()
+
+    async def test_find_cli_not_found(self):
         """Test CLI not found error during connect()."""
         find_cli.cache_clear()
 
         transport = SubprocessCLITransport()
+        with (
+            patch("shutil.which", return_value=None),
+            patch("pathlib.Path.exists", return_value=False),
+            pytest.raises(CLINotFoundError) as exc_info,
+        ):
+            await transport.connect()
 
-        async def _test():
-            with (
-                patch("shutil.which", return_value=None),
-                patch("pathlib.Path.exists", return_value=False),
-                pytest.raises(CLINotFoundError) as exc_info,
-            ):
-                await transport.connect()
-
-            assert "Claude Code not found" in str(exc_info.value)
-
-        anyio.run(_test)
+        assert "Claude Code not found" in str(exc_info.value)
 
     def test_build_command_system_prompt_not_in_cli_args(self):
         """Test that system prompt is not passed as CLI arg (sent via initialize request)."""
@@ -65,14 +82,13 @@ class TestSubprocessCLITransport:
             {"type": "preset", "preset": "claude_code", "append": "Be concise."},
         ]:
             opts = ClaudeAgentOptions(system_prompt=system_prompt)
-            transport = self._make_transport(options=opts)
-            cmd = transport._build_command()
+            cmd = self._build_cmd(options=opts)
             assert "--system-prompt" not in cmd
             assert "--append-system-prompt" not in cmd
 
     def test_build_command_with_options(self):
         """Test building CLI command with options."""
-        transport = self._make_transport(
+        cmd = self._build_cmd(
             options=ClaudeAgentOptions(
                 allowed_tools=["Read", "Write"],
                 disallowed_tools=["Bash"],
@@ -81,8 +97,6 @@ class TestSubprocessCLITransport:
                 max_turns=5,
             ),
         )
-
-        cmd = transport._build_command()
         assert "--allowedTools" in cmd
         assert "Read,Write" in cmd
         assert "--disallowedTools" in cmd
@@ -94,72 +108,114 @@ class TestSubprocessCLITransport:
         assert "--max-turns" in cmd
         assert "5" in cmd
 
-    def test_connect_close(self):
+    async def test_connect_close(self):
         """Test connect and close lifecycle."""
-
-        async def _test():
-            with patch("anyio.open_process") as mock_exec:
-                # Mock version check process
-                mock_version_process = MagicMock()
-                mock_version_process.stdout = MagicMock()
-                mock_version_process.stdout.receive = AsyncMock(return_value=b"2.0.0 (Claude Code)")
-                mock_version_process.terminate = MagicMock()
-                mock_version_process.wait = AsyncMock()
-                # Mock main process
-                mock_process = MagicMock()
-                mock_process.returncode = None
-                mock_process.terminate = MagicMock()
-
-                # Simulate graceful exit: wait() sets returncode to 0
-                async def _graceful_wait():
-                    mock_process.returncode = 0
-
-                mock_process.wait = AsyncMock(side_effect=_graceful_wait)
-                mock_process.stdout = MagicMock()
-                mock_process.stderr = MagicMock()
-                # Mock stdin with aclose method
-                mock_stdin = MagicMock()
-                mock_stdin.aclose = AsyncMock()
-                mock_process.stdin = mock_stdin
-                # Return version process first, then main process
-                mock_exec.side_effect = [mock_version_process, mock_process]
-                transport = SubprocessCLITransport()
-                await transport.connect()
-                assert transport._process is not None
-                await transport.close()
-                # Process should exit gracefully without needing SIGTERM
-                mock_process.terminate.assert_not_called()
-                mock_process.wait.assert_called()
-
-        anyio.run(_test)
-
-    def test_connect_with_nonexistent_cwd(self):
+        with patch("anyio.open_process") as mock_exec:
+            mock_version_process, mock_process = _make_process_mocks()
+
+            # Simulate graceful exit: wait() sets returncode to 0
+            async def _graceful_wait():
+                mock_process.returncode = 0
+
+            mock_process.wait.side_effect = _graceful_wait
+            # Return version process first, then main process
+            mock_exec.side_effect = [mock_version_process, mock_process]
+            transport = SubprocessCLITransport()
+            await transport.connect()
+            assert transport._process is not None
+            await transport.close()
+            # Process should exit gracefully without needing SIGTERM
+            mock_process.terminate.assert_not_called()
+            mock_process.wait.assert_called()
+
+    async def test_connect_with_nonexistent_cwd(self):
         """Test that connect raises CLIConnectionError when cwd doesn't exist."""
-
-        async def _test():
-            opts = ClaudeAgentOptions(cwd="/this/directory/does/not/exist")
-            transport = SubprocessCLITransport(options=opts)
-            with pytest.raises(CLIConnectionError) as exc_info:
-                await transport.connect()
-
-            assert "/this/directory/does/not/exist" in str(exc_info.value)
-
-        anyio.run(_test)
-
-    def test_build_command_with_settings_file(self):
-        """Test building CLI command with settings as file path."""
-        opts = ClaudeAgentOptions(settings="/path/to/settings.json")
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        assert "--settings" in cmd
-        assert "/path/to/settings.json" in cmd
+        opts = ClaudeAgentOptions(cwd="/this/directory/does/not/exist")
+        transport = SubprocessCLITransport(options=opts)
+        with pytest.raises(CLIConnectionError) as exc_info:
+            await transport.connect()
+
+        assert "/this/directory/does/not/exist" in str(exc_info.value)
+
+    @pytest.mark.parametrize(
+        ("options", "flag", "value"),
+        [
+            pytest.param(
+                ClaudeAgentOptions(settings="/path/to/settings.json"),
+                "--settings",
+                "/path/to/settings.json",
+                id="settings_file",
+            ),
+            pytest.param(
+                ClaudeAgentOptions(mcp_servers="/path/to/mcp-config.json"),
+                "--mcp-config",
+                "/path/to/mcp-config.json",
+                id="mcp_servers_str_path",
+            ),
+            pytest.param(
+                ClaudeAgentOptions(mcp_servers=Path("/path/to/mcp-config.json")),
+                "--mcp-config",
+                str(Path("/path/to/mcp-config.json")),
+                id="mcp_servers_path_obj",
+            ),
+            pytest.param(
+                ClaudeAgentOptions(
+                    mcp_servers='{"mcpServers": {"server": {"type": "stdio", "command": "test"}}}'
+                ),
+                "--mcp-config",
+                '{"mcpServers": {"server": {"type": "stdio", "command": "test"}}}',
+                id="mcp_servers_json_string",
+            ),
+            pytest.param(
+                ClaudeAgentOptions(tools=["Read", "Edit", "Bash"]),
+                "--tools",
+                "Read,Edit,Bash",
+                id="tools_array",
+            ),
+            pytest.param(ClaudeAgentOptions(tools=[]), "--tools", "", id="tools_empty_array"),
+            pytest.param(
+                ClaudeAgentOptions(tools={"type": "preset", "preset": "claude_code"}),
+                "--tools",
+                "default",
+                id="tools_preset",
+            ),
+            pytest.param(
+                ClaudeAgentOptions(thinking=ThinkingConfigEnabled(budget_tokens=5000)),
+                "--max-thinking-tokens",
+                "5000",
+                id="thinking_enabled",
+            ),
+            pytest.param(
+                ClaudeAgentOptions(thinking=ThinkingConfigAdaptive()),
+                "--max-thinking-tokens",
+                "32000",
+                id="thinking_adaptive",
+            ),
+            pytest.param(
+                ClaudeAgentOptions(thinking=ThinkingConfigDisabled()),
+                "--max-thinking-tokens",
+                "0",
+                id="thinking_disabled",
+            ),
+            pytest.param(ClaudeAgentOptions(effort="high"), "--effort", "high", id="effort"),
+            pytest.param(
+                ClaudeAgentOptions(context_1m=True),
+                "--betas",
+                "context-1m-2025-08-07",
+                id="context_1m",
+            ),
+        ],
+    )
+    def test_build_command_flag_value(self, options: ClaudeAgentOptions, flag: str, value: str):
+        """Test options that map to a single CLI flag followed by its value."""
+        cmd = self._build_cmd(options)
+        assert cmd[cmd.index(flag) + 1] == value
 
     def test_build_command_with_settings_model(self):
         """Test building CLI command with settings as ClaudeCodeSettings."""
         settings = ClaudeCodeSettings(permissions=Permissions(allow=["Bash(ls:*)"]))
         opts = ClaudeAgentOptions(settings=settings)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
+        cmd = self._build_cmd(options=opts)
         assert "--settings" in cmd
         settings_idx = cmd.index("--settings")
         parsed = json.loads(cmd[settings_idx + 1])
@@ -169,12 +225,11 @@ class TestSubprocessCLITransport:
         """Test building CLI command with extra_args for future flags."""
         args = {"new-flag": "value", "boolean-flag": None, "another-option": "test-value"}
         opts = ClaudeAgentOptions(extra_args=args)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        cmd_str = " ".join(cmd)
+        cmd = self._build_cmd(options=opts)
+        pairs = dict(itertools.pairwise(cmd))
         # Check flags with values
-        assert "--new-flag value" in cmd_str
-        assert "--another-option test-value" in cmd_str
+        assert pairs["--new-flag"] == "value"
+        assert pairs["--another-option"] == "test-value"
         # Check boolean flag (no value)
         assert "--boolean-flag" in cmd
         # Make sure boolean flag doesn't have a value after it
@@ -191,8 +246,7 @@ class TestSubprocessCLITransport:
             )
         }
         opts = ClaudeAgentOptions(mcp_servers=mcp_servers)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
+        cmd = self._build_cmd(options=opts)
         # Find the --mcp-config flag and its value
         assert "--mcp-config" in cmd
         mcp_idx = cmd.index("--mcp-config")
@@ -204,197 +258,102 @@ class TestSubprocessCLITransport:
         assert server["command"] == "/path/to/server"
         assert server["args"] == ["--option", "value"]
 
-    def test_build_command_with_mcp_servers_as_file_path(self):
-        """Test building CLI command with mcp_servers as file path."""
-        # Test with string path
-        string_path = "/path/to/mcp-config.json"
-        opts = ClaudeAgentOptions(mcp_servers=string_path)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        assert "--mcp-config" in cmd
-        mcp_idx = cmd.index("--mcp-config")
-        assert cmd[mcp_idx + 1] == string_path
-        # Test with Path object
-        path_obj = Path("/path/to/mcp-config.json")
-        opts = ClaudeAgentOptions(mcp_servers=path_obj)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        assert "--mcp-config" in cmd
-        mcp_idx = cmd.index("--mcp-config")
-        # Path object gets converted to string, compare with str(path_obj)
-        assert cmd[mcp_idx + 1] == str(path_obj)
-
-    def test_build_command_with_mcp_servers_as_json_string(self):
-        """Test building CLI command with mcp_servers as JSON string."""
-        json_config = '{"mcpServers": {"server": {"type": "stdio", "command": "test"}}}'
-        opts = ClaudeAgentOptions(mcp_servers=json_config)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        assert "--mcp-config" in cmd
-        mcp_idx = cmd.index("--mcp-config")
-        assert cmd[mcp_idx + 1] == json_config
-
-    def test_env_vars_passed_to_subprocess(self):
+    async def test_env_vars_passed_to_subprocess(self):
         """Test that custom environment variables are passed to the subprocess."""
-
-        async def _test():
-            test_value = f"test-{uuid.uuid4().hex[:8]}"
-            custom_env = {"MY_TEST_VAR": test_value}
-            options = ClaudeAgentOptions(env=custom_env)
-            # Mock the subprocess to capture the env argument
-            with patch("anyio.open_process", new_callable=AsyncMock) as mock_open_process:
-                # Mock version check process
-                mock_version_process = MagicMock()
-                mock_version_process.stdout = MagicMock()
-                mock_version_process.stdout.receive = AsyncMock(return_value=b"2.0.0 (Claude Code)")
-                mock_version_process.terminate = MagicMock()
-                mock_version_process.wait = AsyncMock()
-                # Mock main process
-                mock_process = MagicMock()
-                mock_process.stdout = MagicMock()
-                mock_stdin = MagicMock()
-                mock_stdin.aclose = AsyncMock()  # Add async aclose method
-                mock_process.stdin = mock_stdin
-                mock_process.returncode = None
-                # Return version process first, then main process
-                mock_open_process.side_effect = [mock_version_process, mock_process]
-                transport = SubprocessCLITransport(options=options)
-                await transport.connect()
-                # Verify open_process was called twice (version check + main process)
-                assert mock_open_process.call_count == 2
-                # Check the second call (main process) for env vars
-                second_call_kwargs = mock_open_process.call_args_list[1].kwargs
-                assert "env" in second_call_kwargs
-                env_passed = second_call_kwargs["env"]
-                # Check that custom env var was passed
-                assert env_passed["MY_TEST_VAR"] == test_value
-                # Verify SDK identifier is present
-                assert "CLAUDE_CODE_ENTRYPOINT" in env_passed
-                assert env_passed["CLAUDE_CODE_ENTRYPOINT"] == "sdk-py"
-                # Verify system env vars are also included with correct values
-                if "PATH" in os.environ:
-                    assert "PATH" in env_passed
-                    assert env_passed["PATH"] == os.environ["PATH"]
-
-        anyio.run(_test)
-
-    def test_claudecode_env_var_is_filtered(self):
+        test_value = f"test-{uuid.uuid4().hex[:8]}"
+        custom_env = {"MY_TEST_VAR": test_value}
+        options = ClaudeAgentOptions(env=custom_env)
+        # Mock the subprocess to capture the env argument
+        with patch("anyio.open_process", new_callable=AsyncMock) as mock_open_process:
+            mock_version_process, mock_process = _make_process_mocks()
+            # Return version process first, then main process
+            mock_open_process.side_effect = [mock_version_process, mock_process]
+            transport = SubprocessCLITransport(options=options)
+            await transport.connect()
+            # Verify open_process was called twice (version check + main process)
+            assert mock_open_process.call_count == 2
+            # Check the second call (main process) for env vars
+            second_call_kwargs = mock_open_process.call_args_list[1].kwargs
+            assert "env" in second_call_kwargs
+            env_passed = second_call_kwargs["env"]
+            # Check that custom env var was passed
+            assert env_passed["MY_TEST_VAR"] == test_value
+            # Verify SDK identifier is present
+            assert "CLAUDE_CODE_ENTRYPOINT" in env_passed
+            assert env_passed["CLAUDE_CODE_ENTRYPOINT"] == "sdk-py"
+            # Verify system env vars are also included with correct values
+            if "PATH" in os.environ:
+                assert "PATH" in env_passed
+                assert env_passed["PATH"] == os.environ["PATH"]
+
+    async def test_claudecode_env_var_is_filtered(self):
         """Test that CLAUDECODE env var is filtered from subprocess to prevent nesting detection."""
-
-        async def _test():
-            # Simulate running inside Claude Code
-            os.environ["CLAUDECODE"] = "1"
-            options = ClaudeAgentOptions()
-
-            # Mock the subprocess to capture the env argument
-            with patch("anyio.open_process", new_callable=AsyncMock) as mock_open_process:
-                # Mock version check process
-                mock_version_process = MagicMock()
-                mock_version_process.stdout = MagicMock()
-                mock_version_process.stdout.receive = AsyncMock(return_value=b"2.0.0 (Claude Code)")
-                mock_version_process.terminate = MagicMock()
-                mock_version_process.wait = AsyncMock()
-                # Mock main process
-                mock_process = MagicMock()
-                mock_process.stdout = MagicMock()
-                mock_stdin = MagicMock()
-                mock_stdin.aclose = AsyncMock()
-                mock_process.stdin = mock_stdin
-                mock_process.returncode = None
-                # Return version process first, then main process
-                mock_open_process.side_effect = [mock_version_process, mock_process]
-                transport = SubprocessCLITransport(options=options)
-                await transport.connect()
-                # Verify open_process was called twice (version check + main process)
-                assert mock_open_process.call_count == 2
-                # Check the second call (main process) for env vars
-                second_call_kwargs = mock_open_process.call_args_list[1].kwargs
-                assert "env" in second_call_kwargs
-                env_passed = second_call_kwargs["env"]
-                # CLAUDECODE should NOT be in env (filtered to prevent nesting detection)
-                assert "CLAUDECODE" not in env_passed
-                # But other vars should be present
-                assert "CLAUDE_CODE_ENTRYPOINT" in env_passed
-                assert env_passed["CLAUDE_CODE_ENTRYPOINT"] == "sdk-py"
-
-        anyio.run(_test)
-
-    def test_claudecode_can_be_explicitly_set(self):
+        # Simulate running inside Claude Code
+        os.environ["CLAUDECODE"] = "1"
+        options = ClaudeAgentOptions()
+
+        # Mock the subprocess to capture the env argument
+        with patch("anyio.open_process", new_callable=AsyncMock) as mock_open_process:
+            mock_version_process, mock_process = _make_process_mocks()
+            # Return version process first, then main process
+            mock_open_process.side_effect = [mock_version_process, mock_process]
+            transport = SubprocessCLITransport(options=options)
+            await transport.connect()
+            # Verify open_process was called twice (version check + main process)
+            assert mock_open_process.call_count == 2
+            # Check the second call (main process) for env vars
+            second_call_kwargs = mock_open_process.call_args_list[1].kwargs
+            assert "env" in second_call_kwargs
+            env_passed = second_call_kwargs["env"]
+            # CLAUDECODE should NOT be in env (filtered to prevent nesting detection)
+            assert "CLAUDECODE" not in env_passed
+            # But other vars should be present
+            assert "CLAUDE_CODE_ENTRYPOINT" in env_passed
+            assert env_passed["CLAUDE_CODE_ENTRYPOINT"] == "sdk-py"
+
+    async def test_claudecode_can_be_explicitly_set(self):
         """Test that CLAUDECODE can be explicitly set via options env if needed."""
-
-        async def _test():
-            # Simulate running inside Claude Code
-            os.environ["CLAUDECODE"] = "1"
-            # User explicitly wants CLAUDECODE set (unusual but allowed)
-            options = ClaudeAgentOptions(env={"CLAUDECODE": "1"})
-            # Mock the subprocess to capture the env argument
-            with patch("anyio.open_process", new_callable=AsyncMock) as mock_open_process:
-                # Mock version check process
-                mock_version_process = MagicMock()
-                mock_version_process.stdout = MagicMock()
-                mock_version_process.stdout.receive = AsyncMock(return_value=b"2.0.0 (Claude Code)")
-                mock_version_process.terminate = MagicMock()
-                mock_version_process.wait = AsyncMock()
-
-                # Mock main process
-                mock_process = MagicMock()
-                mock_process.stdout = MagicMock()
-                mock_stdin = MagicMock()
-                mock_stdin.aclose = AsyncMock()
-                mock_process.stdin = mock_stdin
-                mock_process.returncode = None
-                # Return version process first, then main process
-                mock_open_process.side_effect = [mock_version_process, mock_process]
-                transport = SubprocessCLITransport(options=options)
-                await transport.connect()
-                # Verify open_process was called twice
-                assert mock_open_process.call_count == 2
-                # Check the second call (main process) for env vars
-                second_call_kwargs = mock_open_process.call_args_list[1].kwargs
-                assert "env" in second_call_kwargs
-                env_passed = second_call_kwargs["env"]
-                # CLAUDECODE SHOULD be in env because user explicitly provided it
-                assert "CLAUDECODE" in env_passed
-                assert env_passed["CLAUDECODE"] == "1"
-
-        anyio.run(_test)
-
-    def test_connect_as_different_user(self):
+        # Simulate running inside Claude Code
+        os.environ["CLAUDECODE"] = "1"
+        # User explicitly wants CLAUDECODE set (unusual but allowed)
+        options = ClaudeAgentOptions(env={"CLAUDECODE": "1"})
+        # Mock the subprocess to capture the env argument
+        with patch("anyio.open_process", new_callable=AsyncMock) as mock_open_process:
+            mock_version_process, mock_process = _make_process_mocks()
+            # Return version process first, then main process
+            mock_open_process.side_effect = [mock_version_process, mock_process]
+            transport = SubprocessCLITransport(options=options)
+            await transport.connect()
+            # Verify open_process was called twice
+            assert mock_open_process.call_count == 2
+            # Check the second call (main process) for env vars
+            second_call_kwargs = mock_open_process.call_args_list[1].kwargs
+            assert "env" in second_call_kwargs
+            env_passed = second_call_kwargs["env"]
+            # CLAUDECODE SHOULD be in env because user explicitly provided it
+            assert "CLAUDECODE" in env_passed
+            assert env_passed["CLAUDECODE"] == "1"
+
+    async def test_connect_as_different_user(self):
         """Test connect as different user."""
-
-        async def _test():
-            custom_user = "claude"
-            options = ClaudeAgentOptions(user=custom_user)
-
-            # Mock the subprocess to capture the env argument
-            with patch("anyio.open_process", new_callable=AsyncMock) as mock_open_process:
-                # Mock version check process
-                mock_version_process = MagicMock()
-                mock_version_process.stdout = MagicMock()
-                mock_version_process.stdout.receive = AsyncMock(return_value=b"2.0.0 (Claude Code)")
-                mock_version_process.terminate = MagicMock()
-                mock_version_process.wait = AsyncMock()
-                # Mock main process
-                mock_process = MagicMock()
-                mock_process.stdout = MagicMock()
-                mock_stdin = MagicMock()
-                mock_stdin.aclose = AsyncMock()  # Add async aclose method
-                mock_process.stdin = mock_stdin
-                mock_process.returncode = None
-                # Return version process first, then main process
-                mock_open_process.side_effect = [mock_version_process, mock_process]
-                transport = SubprocessCLITransport(options=options)
-                await transport.connect()
-                # Verify open_process was called twice (version check + main process)
-                assert mock_open_process.call_count == 2
-                # Check the second call (main process) for user
-                second_call_kwargs = mock_open_process.call_args_list[1].kwargs
-                assert "user" in second_call_kwargs
-                user_passed = second_call_kwargs["user"]
-                # Check that user was passed
-                assert user_passed == "claude"
-
-        anyio.run(_test)
+        custom_user = "claude"
+        options = ClaudeAgentOptions(user=custom_user)
+
+        # Mock the subprocess to capture the env argument
+        with patch("anyio.open_process", new_callable=AsyncMock) as mock_open_process:
+            mock_version_process, mock_process = _make_process_mocks()
+            # Return version process first, then main process
+            mock_open_process.side_effect = [mock_version_process, mock_process]
+            transport = SubprocessCLITransport(options=options)
+            await transport.connect()
+            # Verify open_process was called twice (version check + main process)
+            assert mock_open_process.call_count == 2
+            # Check the second call (main process) for user
+            second_call_kwargs = mock_open_process.call_args_list[1].kwargs
+            assert "user" in second_call_kwargs
+            user_passed = second_call_kwargs["user"]
+            # Check that user was passed
+            assert user_passed == "claude"
 
     def test_build_command_with_sandbox_only(self):
         """Test building CLI command with sandbox settings (no existing settings)."""
@@ -407,8 +366,7 @@ class TestSubprocessCLITransport:
             ),
         )
         opts = ClaudeAgentOptions(sandbox=sandbox)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
+        cmd = self._build_cmd(options=opts)
         # Should have --settings with sandbox merged in
         assert "--settings" in cmd
         settings_idx = cmd.index("--settings")
@@ -428,8 +386,7 @@ class TestSubprocessCLITransport:
         )
         sandbox = Sandbox(enabled=True, excluded_commands=["git", "docker"])
         opts = ClaudeAgentOptions(settings=settings, sandbox=sandbox)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
+        cmd = self._build_cmd(options=opts)
         # Should have merged settings
         assert "--settings" in cmd
         settings_idx = cmd.index("--settings")
@@ -442,22 +399,11 @@ class TestSubprocessCLITransport:
         assert parsed["sandbox"]["enabled"] is True
         assert parsed["sandbox"]["excludedCommands"] == ["git", "docker"]
 
-    def test_build_command_with_settings_file_and_no_sandbox(self):
-        """Test that settings file path is passed through when no sandbox."""
-        opts = ClaudeAgentOptions(settings="/path/to/settings.json")
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        # Should pass path directly, not parse it
-        assert "--settings" in cmd
-        settings_idx = cmd.index("--settings")
-        assert cmd[settings_idx + 1] == "/path/to/settings.json"
-
     def test_build_command_sandbox_minimal(self):
         """Test sandbox with minimal configuration."""
         sandbox = Sandbox(enabled=True)  # pyright: ignore[reportCallIssue]
         opts = ClaudeAgentOptions(sandbox=sandbox)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
+        cmd = self._build_cmd(options=opts)
         assert "--settings" in cmd
         settings_idx = cmd.index("--settings")
         settings_value = cmd[settings_idx + 1]
@@ -483,8 +429,7 @@ class TestSubprocessCLITransport:
             ),
         )
         opts = ClaudeAgentOptions(sandbox=sandbox)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
+        cmd = self._build_cmd(options=opts)
         settings_idx = cmd.index("--settings")
         settings_value = cmd[settings_idx + 1]
         parsed = json.loads(settings_value)
@@ -495,37 +440,9 @@ class TestSubprocessCLITransport:
         assert network["httpProxyPort"] == 8080
         assert network["socksProxyPort"] == 8081
 
-    def test_build_command_with_tools_array(self):
-        """Test building CLI command with tools as array of tool names."""
-        opts = ClaudeAgentOptions(tools=["Read", "Edit", "Bash"])
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        assert "--tools" in cmd
-        tools_idx = cmd.index("--tools")
-        assert cmd[tools_idx + 1] == "Read,Edit,Bash"
-
-    def test_build_command_with_tools_empty_array(self):
-        """Test building CLI command with tools as empty array (disables all tools)."""
-        opts = ClaudeAgentOptions(tools=[])
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        assert "--tools" in cmd
-        tools_idx = cmd.index("--tools")
-        assert cmd[tools_idx + 1] == ""
-
-    def test_build_command_with_tools_preset(self):
-        """Test building CLI command with tools preset."""
-        opts = ClaudeAgentOptions(tools={"type": "preset", "preset": "claude_code"})
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
-        assert "--tools" in cmd
-        tools_idx = cmd.index("--tools")
-        assert cmd[tools_idx + 1] == "default"
-
     def test_build_command_without_tools(self):
         """Test building CLI command without tools option (default None)."""
-        transport = self._make_transport()
-        cmd = transport._build_command()
+        cmd = self._build_cmd()
         assert "--tools" not in cmd
 
     async def test_concurrent_writes_are_serialized(self):
@@ -639,15 +556,13 @@ class TestSubprocessCLITransport:
         }
         # Test with string prompt
         opts = ClaudeAgentOptions(agents=agents)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
+        cmd = self._build_cmd(options=opts)
         assert "--agents" not in cmd
         assert "--input-format" in cmd
         assert "stream-json" in cmd
 
         # Verify same behavior with different options
-        transport2 = self._make_transport(options=ClaudeAgentOptions(agents=agents))
-        cmd2 = transport2._build_command()
+        cmd2 = self._build_cmd(options=ClaudeAgentOptions(agents=agents))
         assert "--agents" not in cmd2
         assert "--input-format" in cmd2
         assert "stream-json" in cmd2
@@ -659,8 +574,7 @@ class TestSubprocessCLITransport:
         so that agents and other large configs can be sent via initialize request.
         """
         # String prompt should still use streaming
-        transport = self._make_transport()
-        cmd = transport._build_command()
+        cmd = self._build_cmd()
         assert "--input-format" in cmd
         assert "stream-json" in cmd
         assert "--print" not in cmd
@@ -675,8 +589,7 @@ class TestSubprocessCLITransport:
         large_prompt = "x" * 50000
         agents = {"large-agent": AgentDefinition(description="A large agent", prompt=large_prompt)}
         opts = ClaudeAgentOptions(agents=agents)
-        transport = self._make_transport(options=opts)
-        cmd = transport._build_command()
+        cmd = self._build_cmd(options=opts)
         # --agents should not be in command (sent via initialize)
         assert "--agents" not in cmd
         # No @filepath references should exist